@@ -1,3 +1,10 @@
+import csv
+import heapq
+import sys
+
+from operator import itemgetter
+
+
 def main():
     """
     Entry point of the program.
@@ -24,7 +31,10 @@ class Style:
     CYAN = "\033[36m"
     WHITE = "\033[37m"
 
+    @staticmethod
     def color(text, *codes):
+        # Fine for one-off lines; loops that print many rows put the
+        # codes straight into an f-string instead (see choose_song)
         return "".join(codes) + str(text) + Style.RESET
 
 
@@ -34,6 +44,130 @@ def banner():
     print(Style.color("═" * 52 + "\n", Style.CYAN))
 
 
+# -----------------------------
+# File reading
+# -----------------------------
+def csv_rows(filename):
+    """
+    Yields the rows of a CSV file one at a time (no readlines() copy
+    of the whole file in memory).
+    newline="" lets csv.reader handle \n, \r\n and old Mac \r endings.
+    QUOTE_NONE keeps quote characters as plain text, so one stray quote
+    can't swallow the rows after it (every line is parsed on its own).
+    """
+    with open(filename, "r", encoding="utf-8", newline="") as file:
+        yield from csv.reader(file, quoting=csv.QUOTE_NONE)
+
+
+def parse_songs_csv(filename):
+    """
+    Reads songs.csv and turns the rows into Song objects.
+    Returns (songs, skipped): the unique songs in file order, and how
+    many bad lines were skipped.
+
+    IMPORTANT FIXES:
+    - Skips header lines anywhere in the file (not just the first line)
+    - Handles extra commas in the TITLE by parsing from the right
+    - Ignores blank lines
+    - Automatically removes duplicates (same title + artist)
+    """
+    rows = []  # every valid song, duplicates included
+    skipped = 0
+
+    for row in csv_rows(filename):
+        # Blank line (csv.reader gives [] or just the spaces)
+        # Rows like ",,,," are NOT blank: they count as bad lines below
+        if not row or (len(row) == 1 and not row[0].strip()):
+            continue
+
+        # csv.reader already split the row by comma
+        parts = [p.strip() for p in row]
+
+        # If someone pasted the header multiple times, skip it
+        lower = ",".join(parts).lower().replace(" ", "")
+        if lower == "title,artist,genre,bpm,energy":
+            continue
+
+        # Sometimes titles have commas (ex: "My Neck, My Back")
+        # That creates MORE than 5 columns.
+        # We'll parse from RIGHT:
+        # last = energy, second last = bpm, third last = genre
+        # remaining left side contains "title,artist" (title may include commas)
+        if len(parts) < 5:
+            skipped += 1
+            continue
+
+        # Pull last 3 guaranteed fields
+        energy = parts[-1]
+        bpm = parts[-2]
+        genre = parts[-3]
+
+        # Skip any accidental "bpm"/"energy" text rows
+        if bpm.lower() == "bpm" or energy.lower() == "energy":
+            continue
+
+        # Rebuild the left side which should contain title + artist
+        left = ",".join(parts[:-3])
+
+        # Now split left into title + artist by the FIRST comma only
+        title, artist = left.split(",", 1)
+
+        song = Song(title, artist, genre, bpm, energy)
+
+        # If BPM failed to parse (0), skip it (bad row)
+        if song.bpm == 0:
+            skipped += 1
+            continue
+
+        rows.append(song)
+
+    # Remove duplicates (same title + artist) in one pass at the end,
+    # keeping the FIRST copy of each song (file order stays the same)
+    seen = set()  # _dedup hashes kept so far
+    songs = []
+    for song in rows:
+        if song._dedup not in seen:
+            seen.add(song._dedup)
+            songs.append(song)
+
+    return songs, skipped
+
+
+# -----------------------------
+# Scoring
+# -----------------------------
+def make_scorer(direction):
+    """
+    Builds a scoring function for ONE energy goal
+    (direction: +1 = up, -1 = down, 0 = same).
+
+    The goal never changes during a call, so everything that depends on it
+    is worked out here, once: the energy bonus for every (current energy,
+    candidate energy) pair on the 1-5 scale. The returned function then
+    just looks bonuses up instead of checking the goal for every song.
+    """
+    bonus_tables = []
+    for cur_energy in range(6):
+        if direction:
+            bonus_tables.append([20 if direction * (e - cur_energy) > 0 else -5 for e in range(6)])
+        else:
+            bonus_tables.append([10 if e == cur_energy else 0 for e in range(6)])
+
+    def score(bpm, energy, genre, pool, cur_bpm, cur_energy, cur_genre):
+        """
+        Scores every song index in pool in ONE pass over the columns.
+        Returns the scores in the same order as pool.
+        """
+        bonus = bonus_tables[cur_energy]
+
+        # Closer BPM scores higher (DJ realism), plus energy + genre bonus
+        # (True/False counts as 1/0, so the genre match needs no if)
+        return [100 - 2 * abs(bpm[i] - cur_bpm) + bonus[energy[i]] + 10 * (genre[i] == cur_genre)
+                for i in pool]
+
+    return score
+
+
 # -----------------------------
 # Data model
 # -----------------------------
@@ -57,10 +191,22 @@ class Song:
         if self.energy > 5:
             self.energy = 5
 
+        # Position in DJAssistant.songs (and its columns), set when loaded
+        self.index = -1
+        # Small int for the (lowercased) genre, set when loaded
+        self.genre_id = -1
+
+        # Lowercase once here instead of on every key() call
+        self._key = (self.title.lower(), self.artist.lower())
+        # One int for duplicate checks (a 64-bit hash, collisions are
+        # not a real concern for a song library)
+        self._dedup = hash(self._key)
+
+    @staticmethod
     def _safe_int(value, default=0):
         try:
-            return int(str(value).strip())
-        except ValueError:
+            return int(value)  # int() already ignores surrounding spaces
+        except (TypeError, ValueError):
             return default
 
     def key(self):
@@ -68,7 +214,7 @@ class Song:
         Used to detect duplicates.
         (title + artist) is a good "unique key" for this project.
         """
-        return (self.title.lower(), self.artist.lower())
+        return self._key
 
     def __str__(self):
         return f"{self.title} - {self.artist} ({self.genre}, {self.bpm} BPM, E{self.energy})"
@@ -84,88 +230,54 @@ class DJAssistant:
     """
     def __init__(self, filename):
         self.songs = []              # List to store Song objects
+        self._genre_ids = {}         # lowercased genre -> small int id
+        self._score_fns = {          # one ready-made scorer per energy goal
+            "up": make_scorer(+1),
+            "down": make_scorer(-1),
+            "same": make_scorer(0),
+        }
         self.load_songs(filename)    # Load songs from CSV file
 
     def load_songs(self, filename):
         """
-        Loads song data from a CSV file and converts each row into a Song object.
-
-        IMPORTANT FIXES:
-        - Skips header lines anywhere in the file (not just the first line)
-        - Handles extra commas in the TITLE by parsing from the right
-        - Ignores blank lines
-        - Automatically removes duplicates (same title + artist)
+        Loads song data from a CSV file (see parse_songs_csv) and builds
+        the columns and lookups the rest of the program uses.
         """
         try:
-            with open(filename, "r", encoding="utf-8") as file:
-                raw_lines = file.readlines()
-
-            unique = set()
-            loaded = 0
-            skipped = 0
-
-            for line in raw_lines:
-                line = line.strip()
-                if not line:
-                    continue
-
-                # If someone pasted the header multiple times, skip it
-                lower = line.lower().replace(" ", "")
-                if lower == "title,artist,genre,bpm,energy":
-                    continue
-
-                # Split by comma (your file is plain comma-separated)
-                parts = [p.strip() for p in line.split(",")]
-
-                # Sometimes titles have commas (ex: "My Neck, My Back")
-                # That creates MORE than 5 columns.
-                # We'll parse from RIGHT:
-                # last = energy, second last = bpm, third last = genre
-                # remaining left side contains "title,artist" (title may include commas)
-                if len(parts) < 5:
-                    skipped += 1
-                    continue
-
-                # Pull last 3 guaranteed fields
-                energy = parts[-1]
-                bpm = parts[-2]
-                genre = parts[-3]
-
-                # Skip any accidental "bpm"/"energy" text rows
-                if str(bpm).strip().lower() == "bpm" or str(energy).strip().lower() == "energy":
-                    continue
-
-                # Rebuild the left side which should contain title + artist
-                left = ",".join(parts[:-3])
-
-                # Now split left into title + artist by the FIRST comma only
-                if "," not in left:
-                    skipped += 1
-                    continue
-
-                title, artist = left.split(",", 1)
-
-                song = Song(title, artist, genre, bpm, energy)
-
-                # If BPM failed to parse (0), skip it (bad row)
-                if song.bpm == 0:
-                    skipped += 1
-                    continue
-
-                # Remove duplicates (same title + artist)
-                k = song.key()
-                if k in unique:
-                    continue
-
-                unique.add(k)
+            songs, skipped = parse_songs_csv(filename)
+
+            for song in songs:
+                song.index = len(self.songs)
+                song.genre_id = self._genre_ids.setdefault(song.genre.lower(), len(self._genre_ids))
                 self.songs.append(song)
-                loaded += 1
+            loaded = len(self.songs)
 
             # If file was empty/bad
             if not self.songs:
                 print(Style.color("Error: No valid songs loaded. Check songs.csv format.", Style.RED))
                 exit()
 
+            # Store each attribute in its own column (one list per field).
+            # recommend() scores straight from these plain ints, so it never
+            # has to look attributes up on thousands of Song objects.
+            # (Plain lists on purpose: indexing an array.array makes a new
+            # int object every time, which made scoring slower.)
+            self.bpm_col = [song.bpm for song in self.songs]
+            self.energy_col = [song.energy for song in self.songs]
+            self.genre_col = [song.genre_id for song in self.songs]
+
+            # Song indexes grouped by genre, built once so filtering by
+            # genre later is just a dict lookup
+            self._all_idx = range(len(self.songs))
+            self._by_genre = {}
+            for song in self.songs:
+                self._by_genre.setdefault(song.genre, []).append(song.index)
+
+            # Sorted genre names for the menu, plus a lowercase lookup
+            # (reversed so the first match in sorted order wins)
+            self._sorted_genres = tuple(sorted(self._by_genre))
+            self._genre_lookup = {g.lower(): g for g in reversed(self._sorted_genres)}
+
             print(Style.color(f"Loaded {loaded} songs (duplicates auto-removed).", Style.GREEN))
             if skipped > 0:
                 print(Style.color(f"Skipped {skipped} bad/invalid lines.", Style.YELLOW))
@@ -173,16 +285,22 @@ class DJAssistant:
         except FileNotFoundError:
             print(Style.color("Error: songs.csv file not found.", Style.RED))
             exit()
+        except (csv.Error, UnicodeDecodeError) as e:
+            print(Style.color(f"Error: could not read songs.csv ({e}).", Style.RED))
+            exit()
 
     def choose_song(self, filtered_songs):
         """
         Displays songs and lets the user choose the current track.
         """
-        print(Style.color("Available Songs:", Style.BOLD, Style.WHITE))
+        # Build the whole list first, then write it out in one go
+        lines = [Style.color("Available Songs:", Style.BOLD, Style.WHITE)]
+        cyan, dim, reset = Style.CYAN, Style.DIM, Style.RESET
         for i, song in enumerate(filtered_songs):
-            print(f"{Style.color(str(i+1).rjust(2), Style.CYAN)}. "
-                  f"{song.title} {Style.color('-', Style.DIM)} {song.artist} "
-                  f"{Style.color(f'({song.genre}, {song.bpm} BPM, E{song.energy})', Style.DIM)}")
+            lines.append(f"{cyan}{i+1:>2}{reset}. "
+                         f"{song.title} {dim}-{reset} {song.artist} "
+                         f"{dim}({song.genre}, {song.bpm} BPM, E{song.energy}){reset}")
+        sys.stdout.write("\n".join(lines) + "\n")
 
         while True:
             choice = input(Style.color("\nChoose current song number: ", Style.YELLOW)).strip()
@@ -197,18 +315,17 @@ class DJAssistant:
         Optional: let user filter by genre to make the list easier to navigate.
         (You can just press Enter to skip.)
         """
-        genres = sorted(set(song.genre for song in self.songs))
         print(Style.color("Genres found:", Style.BOLD, Style.WHITE))
-        print(Style.color(", ".join(genres), Style.DIM))
+        print(Style.color(", ".join(self._sorted_genres), Style.DIM))
 
         g = input(Style.color("\nType a genre to filter (or press Enter for ALL): ", Style.YELLOW)).strip()
         if not g:
             return None
 
         # Match case-insensitively
-        for real in genres:
-            if real.lower() == g.lower():
-                return real
+        real = self._genre_lookup.get(g.lower())
+        if real:
+            return real
 
         print(Style.color("Genre not found. Showing ALL songs.", Style.YELLOW))
         return None
@@ -225,58 +342,56 @@ class DJAssistant:
 
     def recommend(self, current_song, goal, pool):
         """
-        Scores and ranks songs based on:
+        Scores and ranks songs (pool = list of song indexes) based on:
         - BPM closeness
         - Energy direction (up/down/same)
         - Genre match bonus
 
         Returns top 5 + a "why" explanation for each recommendation.
         """
+        cur_bpm = current_song.bpm
+        cur_energy = current_song.energy
+        # (None if no loaded song has this genre -> no genre bonus)
+        cur_genre = self._genre_ids.get(current_song.genre.lower())
+
+        # Column indexes of every candidate (skip current song)
+        cur = current_song.index
+        if 0 <= cur < len(self.songs) and self.songs[cur] is current_song:
+            idx = [i for i in pool if i != cur]
+        else:
+            # A Song we didn't load ourselves: skip by title + artist instead
+            key = current_song.key()
+            idx = [i for i in pool if self.songs[i].key() != key]
+
+        # Score each candidate straight from the columns
+        # (the scorer for this goal was built once in __init__;
+        # anything that isn't "up"/"down" is scored like "same")
+        scorer = self._score_fns.get(goal, self._score_fns["same"])
+        scores = scorer(self.bpm_col, self.energy_col, self.genre_col, idx,
+                        cur_bpm, cur_energy, cur_genre)
+
+        # Only the top 5 are needed, so don't sort the whole list.
+        # Keep just (score, index) pairs until the winners are known.
+        top = heapq.nlargest(5, zip(scores, idx), key=itemgetter(0))
+
+        # Build an explanation (helps your presentation)
+        # -- only for the 5 songs that are actually shown
         recommendations = []
+        for score, i in top:
+            # (numbers come from the columns; the Song is only kept for display)
+            energy = self.energy_col[i]
 
-        for song in pool:
-            if song.key() == current_song.key():
-                continue  # skip current song
-
-            bpm_diff = abs(song.bpm - current_song.bpm)
-            energy_diff = song.energy - current_song.energy
-
-            # Score closer BPM higher (DJ realism)
-            score = 100 - (bpm_diff * 2)
-
-            # Energy direction bonus
-            if goal == "up":
-                if energy_diff > 0:
-                    score += 20
-                else:
-                    score -= 5
-            elif goal == "down":
-                if energy_diff < 0:
-                    score += 20
-                else:
-                    score -= 5
-            else:  # same
-                if energy_diff == 0:
-                    score += 10
-
-            # Genre bonus
-            if song.genre.lower() == current_song.genre.lower():
-                score += 10
-
-            # Build an explanation (helps your presentation)
-            why = []
-            why.append(f"BPM diff: {bpm_diff}")
+            # One f-string per song (no temporary list + join)
             if goal != "same":
-                why.append(f"Energy change: {energy_diff:+d} (goal: {goal})")
+                energy_part = f"Energy change: {energy - cur_energy:+d} (goal: {goal})"
             else:
-                why.append(f"Energy: {song.energy} (goal: same)")
-            if song.genre.lower() == current_song.genre.lower():
-                why.append("Genre match: +10")
+                energy_part = f"Energy: {energy} (goal: same)"
+            genre_part = "; Genre match: +10" if self.genre_col[i] == cur_genre else ""
+            why = f"BPM diff: {abs(self.bpm_col[i] - cur_bpm)}; {energy_part}{genre_part}"
 
-            recommendations.append((score, song, "; ".join(why)))
+            recommendations.append((score, self.songs[i], why))
 
-        recommendations.sort(reverse=True, key=lambda x: x[0])
-        return recommendations[:5]
+        return recommendations
 
     def run(self):
         """
@@ -286,15 +401,14 @@ class DJAssistant:
 
         # Optional: filter by genre (makes it easier during demo)
         genre_filter = self.choose_genre_filter()
+        # (pool holds song indexes; unknown genre falls back to ALL)
         if genre_filter:
-            pool = [s for s in self.songs if s.genre == genre_filter]
-            if not pool:  # safety fallback
-                pool = self.songs
+            pool = self._by_genre.get(genre_filter, self._all_idx)
         else:
-            pool = self.songs
+            pool = self._all_idx
 
         # Choose current song
-        current_song = self.choose_song(pool)
+        current_song = self.choose_song([self.songs[i] for i in pool])
         print(Style.color("\nNow playing:", Style.DIM) + " " +
               Style.color(str(current_song), Style.BOLD, Style.GREEN))
 
@@ -305,13 +419,15 @@ class DJAssistant:
         results = self.recommend(current_song, goal, pool)
 
         # Display results (pretty + explains WHY)
-        print(Style.color("\nRecommended Next Songs:", Style.BOLD, Style.MAGENTA))
+        lines = [Style.color("\nRecommended Next Songs:", Style.BOLD, Style.MAGENTA)]
+        cyan, bold, dim, reset = Style.CYAN, Style.BOLD, Style.DIM, Style.RESET
         for i, (score, song, why) in enumerate(results, start=1):
-            print(Style.color(f"{i}.", Style.CYAN),
-                  f"{Style.color(song.title, Style.BOLD)} by {song.artist} "
-                  f"{Style.color(f'({song.bpm} BPM, E{song.energy})', Style.DIM)}")
-            print(Style.color("   why:", Style.DIM), Style.color(why, Style.DIM))
-            print(Style.color("   score:", Style.DIM), Style.color(score, Style.DIM))
+            lines.append(f"{cyan}{i}.{reset} "
+                         f"{bold}{song.title}{reset} by {song.artist} "
+                         f"{dim}({song.bpm} BPM, E{song.energy}){reset}")
+            lines.append(f"{dim}   why:{reset} {dim}{why}{reset}")
+            lines.append(f"{dim}   score:{reset} {dim}{score}{reset}")
+        sys.stdout.write("\n".join(lines) + "\n")
 
         print(Style.color("\nDone. Run again to try a different song.\n", Style.CYAN))
 